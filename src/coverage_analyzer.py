@@ -2,9 +2,11 @@
 """BlackRoad Code Coverage Analyzer - Parse, diff, trend, and report coverage data."""
 
 from __future__ import annotations
-import argparse, hashlib, json, math, re, sqlite3, sys, xml.etree.ElementTree as ET
+import argparse, functools, json, math, re, secrets, sqlite3, string, sys, time, xml.etree.ElementTree as ET
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import asdict, dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
@@ -16,6 +18,20 @@ BADGE_THRESHOLDS = [
     (0,  "red", "critical"),
 ]
 
+
+@functools.lru_cache(maxsize=1024)
+def _badge_raw(pct_tenths: int) -> Optional[Tuple[str, str]]:
+    """Resolve (color, label) for a percentage given in tenths of a percent.
+
+    Keyed on an int so repeated badge lookups during bulk report
+    generation hit the cache instead of rescanning the thresholds.
+    """
+    for threshold, color, label in BADGE_THRESHOLDS:
+        if pct_tenths >= threshold * 10:
+            return color, label
+    return None
+
+
 HTML_TEMPLATE = """<!DOCTYPE html>
 <html lang="en">
 <head><meta charset="UTF-8"><title>Coverage Report</title>
@@ -45,14 +61,49 @@ tr:nth-child(even){{background:#f9f9f9}}
 <p><em>Generated: {ts}</em></p>
 </body></html>"""
 
+# HTML_TEMPLATE pre-parsed once at import: str.format rescans the template
+# for placeholders (and unescapes the CSS braces) on every call, which adds
+# up when CI generates reports in bulk. Formatter.parse yields
+# (literal, field, spec) segments with escapes already resolved, so
+# rendering is a join over literals and format() calls.
+_HTML_SEGMENTS = [
+    (literal, name, spec)
+    for literal, name, spec, _conv in string.Formatter().parse(HTML_TEMPLATE)
+]
+
+
+def _render_html(values: Dict) -> str:
+    parts = []
+    for literal, name, spec in _HTML_SEGMENTS:
+        parts.append(literal)
+        if name is not None:
+            parts.append(format(values[name], spec))
+    return "".join(parts)
+
 
-@dataclass
+# Constant row template bound once at import; %-formatting against a reused
+# template is cheaper than rebuilding an f-string per row.
+_ROW_TPL = (
+    '<tr><td>%s</td><td>%d</td><td>%d</td><td>%.1f%%</td>'
+    '<td><div class="bar"><div class="bar-fill" style="width:%d%%;background:%s"></div></div></td></tr>'
+)
+
+
+# slots drops the per-instance __dict__ (~200 bytes each, and reports can
+# carry 100k of these); frozen marks the records immutable.
+@dataclass(slots=True, frozen=True)
 class FileCoverage:
     filename: str
     total_lines: int
     covered_lines: int
     total_branches: int = 0
     covered_branches: int = 0
+    # Computed once at construction; a property would redo the divide and
+    # round on every access, which adds up across 100k-file reports.
+    line_pct: float = field(init=False, default=0.0)
+
+    def __post_init__(self):
+        object.__setattr__(self, "line_pct", round(self.line_rate * 100, 2))
 
     @property
     def line_rate(self) -> float:
@@ -66,12 +117,8 @@ class FileCoverage:
             return 1.0
         return round(self.covered_branches / self.total_branches, 4)
 
-    @property
-    def line_pct(self) -> float:
-        return round(self.line_rate * 100, 2)
-
 
-@dataclass
+@dataclass(slots=True)
 class CoverageReport:
     report_id: str
     timestamp: str
@@ -92,7 +139,86 @@ class CoverageReport:
         return d
 
 
-@dataclass
+def _parse_lcov_file(path: str) -> Tuple[List[FileCoverage], int, int, int, int]:
+    """Parse an LCOV .info file into FileCoverage records plus totals.
+
+    Module-level and side-effect free (no database access) so it can run
+    in worker processes for bulk ingestion. Returns
+    (file_coverages, total_lines, covered_lines, total_branches, covered_branches).
+    """
+    lcov_path = Path(path)
+    if not lcov_path.exists():
+        raise FileNotFoundError(f"LCOV file not found: {path}")
+
+    # Per-file counters packed as a C-long array indexed
+    # [lines_found, lines_hit, branches_found, branches_hit] — one
+    # contiguous allocation per file instead of a dict of boxed ints.
+    files: Dict[str, array] = {}
+    cur: Optional[array] = None
+
+    # newline="\n" disables universal-newline translation, so lines are
+    # never copied on read; CRLF input just leaves a trailing "\r" that
+    # the slicing below accounts for.
+    with open(lcov_path, buffering=1 << 20, newline="\n") as f:
+        for line in f:
+            # Dispatch on the first three chars; DA: dominates large
+            # reports, so it gets the first branch and an inline parse
+            # (no strip/split — int() tolerates trailing whitespace).
+            head = line[:3]
+            if head == "DA:":
+                if cur is None:
+                    continue
+                comma = line.find(",", 3)
+                if comma < 0:
+                    continue
+                end = line.find(",", comma + 1)
+                if end < 0:
+                    # Trim the line terminator by index instead of
+                    # allocating an rstrip'd copy of the hits field.
+                    end = len(line)
+                    while end > comma and line[end - 1] in "\r\n":
+                        end -= 1
+                hits = line[comma + 1:end]
+                cur[0] += 1
+                # lstrip("0") is falsy for any all-zero count ("0", "00", ...)
+                if hits.isdigit() and hits.lstrip("0"):
+                    cur[1] += 1
+            elif head == "SF:":
+                current_file = line[3:].rstrip("\r\n")
+                cur = files[current_file] = array("q", (0, 0, 0, 0))
+            elif head == "LF:":
+                if cur is not None:
+                    cur[0] = int(line[3:])
+            elif head == "LH:":
+                if cur is not None:
+                    cur[1] = int(line[3:])
+            elif head == "BRH" and line[3:4] == ":":
+                if cur is not None:
+                    cur[3] = int(line[4:])
+            elif head == "BRF" and line[3:4] == ":":
+                if cur is not None:
+                    cur[2] = int(line[4:])
+            elif head == "end" and line.startswith("end_of_record"):
+                cur = None
+
+    file_coverages = []
+    total_lines = total_covered = total_branches = covered_branches = 0
+
+    for fname, data in files.items():
+        lf, lh, bf, bh = data
+        total_lines += lf
+        total_covered += lh
+        total_branches += bf
+        covered_branches += bh
+        file_coverages.append(FileCoverage(
+            filename=fname, total_lines=lf, covered_lines=lh,
+            total_branches=bf, covered_branches=bh,
+        ))
+
+    return file_coverages, total_lines, total_covered, total_branches, covered_branches
+
+
+@dataclass(slots=True, frozen=True)
 class CoverageDiff:
     old_pct: float
     new_pct: float
@@ -109,11 +235,27 @@ class CoverageAnalyzer:
 
     def __init__(self, db_path: str = "coverage.db"):
         self.db_path = db_path
+        # One connection for the analyzer's lifetime: reopening per call
+        # costs syscalls, page-cache warm-up, and an fsync on close. WAL
+        # lets trend queries read while an ingestion is writing.
+        self.conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
         self._init_db()
 
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self) -> "CoverageAnalyzer":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
     def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.executescript("""
+        self.conn.executescript("""
                 CREATE TABLE IF NOT EXISTS coverage_history (
                     id TEXT PRIMARY KEY,
                     timestamp TEXT NOT NULL,
@@ -138,79 +280,50 @@ class CoverageAnalyzer:
                     FOREIGN KEY (report_id) REFERENCES coverage_history(id)
                 );
                 CREATE INDEX IF NOT EXISTS idx_history_ts ON coverage_history(timestamp);
-                CREATE INDEX IF NOT EXISTS idx_history_branch ON coverage_history(branch);
+                DROP INDEX IF EXISTS idx_history_branch;
+                CREATE INDEX IF NOT EXISTS idx_history_branch_ts
+                    ON coverage_history(branch, timestamp DESC, overall_pct, id);
                 CREATE INDEX IF NOT EXISTS idx_file_report ON file_coverage(report_id);
             """)
 
     def _gen_id(self) -> str:
-        ts = datetime.utcnow().isoformat()
-        return "cov-" + hashlib.sha256(ts.encode()).hexdigest()[:10]
+        # Nanosecond timestamp plus a short random suffix: unique without
+        # paying for a hash over a formatted ISO string.
+        return f"cov-{time.time_ns():016x}{secrets.token_hex(2)}"
 
     def parse_lcov(self, path: str, commit_sha: str = "", branch: str = "") -> CoverageReport:
         """Parse an LCOV .info file and return a CoverageReport."""
-        lcov_path = Path(path)
-        if not lcov_path.exists():
-            raise FileNotFoundError(f"LCOV file not found: {path}")
-
-        files: Dict[str, Dict] = {}
-        current_file = None
-
-        with open(lcov_path) as f:
-            for line in f:
-                line = line.strip()
-                if line.startswith("SF:"):
-                    current_file = line[3:]
-                    files[current_file] = {
-                        "lines_found": 0, "lines_hit": 0,
-                        "branches_found": 0, "branches_hit": 0, "hit_lines": set()
-                    }
-                elif line.startswith("DA:") and current_file:
-                    parts = line[3:].split(",")
-                    if len(parts) >= 2:
-                        lineno = int(parts[0])
-                        hits = int(parts[1]) if parts[1].strip().lstrip("-").isdigit() else 0
-                        files[current_file]["lines_found"] += 1
-                        if hits > 0:
-                            files[current_file]["lines_hit"] += 1
-                            files[current_file]["hit_lines"].add(lineno)
-                elif line.startswith("BRH:") and current_file:
-                    files[current_file]["branches_hit"] = int(line[4:])
-                elif line.startswith("BRF:") and current_file:
-                    files[current_file]["branches_found"] = int(line[4:])
-                elif line.startswith("LF:") and current_file:
-                    files[current_file]["lines_found"] = int(line[3:])
-                elif line.startswith("LH:") and current_file:
-                    files[current_file]["lines_hit"] = int(line[3:])
-                elif line == "end_of_record":
-                    current_file = None
-
-        file_coverages = []
-        total_lines = total_covered = total_branches = covered_branches = 0
-
-        for fname, data in files.items():
-            lf = data["lines_found"]
-            lh = data["lines_hit"] if isinstance(data["lines_hit"], int) else len(data["lines_hit"])
-            bf = data["branches_found"]
-            bh = data["branches_hit"]
-            total_lines += lf
-            total_covered += lh
-            total_branches += bf
-            covered_branches += bh
-            file_coverages.append(FileCoverage(
-                filename=fname, total_lines=lf, covered_lines=lh,
-                total_branches=bf, covered_branches=bh,
-            ))
+        report = self._report_from_lcov(_parse_lcov_file(path), commit_sha, branch)
+        self._save_report(report)
+        return report
 
+    def parse_lcov_many(self, paths: List[str], commit_sha: str = "",
+                        branch: str = "") -> List[CoverageReport]:
+        """Parse many LCOV files in parallel worker processes and save all.
+
+        Parsing is pure CPU-bound Python, so files are farmed out to a
+        process pool; the reports are then saved sequentially from this
+        process, which keeps SQLite access single-connection.
+        """
+        with ProcessPoolExecutor() as ex:
+            parsed = list(ex.map(_parse_lcov_file, paths))
+        reports = []
+        for result in parsed:
+            report = self._report_from_lcov(result, commit_sha, branch)
+            self._save_report(report)
+            reports.append(report)
+        return reports
+
+    def _report_from_lcov(self, parsed: Tuple, commit_sha: str, branch: str) -> CoverageReport:
+        file_coverages, total_lines, total_covered, total_branches, covered_branches = parsed
         overall = round((total_covered / total_lines * 100) if total_lines > 0 else 0.0, 2)
-        report = CoverageReport(
-            report_id=self._gen_id(), timestamp=datetime.utcnow().isoformat(),
+        return CoverageReport(
+            report_id=self._gen_id(), timestamp=datetime.now(timezone.utc).isoformat(timespec="seconds"),
             source="lcov", overall_pct=overall,
             total_lines=total_lines, covered_lines=total_covered,
             total_branches=total_branches, covered_branches=covered_branches,
             files=file_coverages, commit_sha=commit_sha, branch=branch,
         )
-        self._save_report(report)
-        return report
 
     def parse_cobertura(self, xml_path: str, commit_sha: str = "", branch: str = "") -> CoverageReport:
         """Parse a Cobertura XML coverage file."""
@@ -218,28 +331,43 @@ class CoverageAnalyzer:
         if not path.exists():
             raise FileNotFoundError(f"Cobertura XML not found: {xml_path}")
 
-        tree = ET.parse(str(path))
-        root = tree.getroot()
-
-        overall_line_rate = float(root.get("line-rate", "0"))
-        lines_valid = int(root.get("lines-valid", "0"))
-        lines_covered = int(root.get("lines-covered", "0"))
-        branches_valid = int(root.get("branches-valid", "0"))
-        branches_covered = int(root.get("branches-covered", "0"))
+        # Stream the XML instead of building the full DOM: count <line>
+        # elements as they close and free each <class> subtree immediately,
+        # so peak memory is one class rather than the whole report.
+        overall_line_rate = 0.0
+        lines_valid = lines_covered = branches_valid = branches_covered = 0
 
         file_coverages = []
-        for cls in root.iter("class"):
-            fname = cls.get("filename", "unknown")
-            f_lines = list(cls.iter("line"))
-            f_total = len(f_lines)
-            f_covered = sum(1 for ln in f_lines if int(ln.get("hits", "0")) > 0)
-            file_coverages.append(FileCoverage(
-                filename=fname, total_lines=f_total, covered_lines=f_covered,
-            ))
+        cls_fname = None
+        f_total = f_covered = 0
+        for event, elem in ET.iterparse(str(path), events=("start", "end")):
+            if event == "start":
+                if elem.tag == "class":
+                    cls_fname = elem.get("filename", "unknown")
+                    f_total = f_covered = 0
+                elif elem.tag == "coverage":
+                    overall_line_rate = float(elem.get("line-rate", "0"))
+                    lines_valid = int(elem.get("lines-valid", "0"))
+                    lines_covered = int(elem.get("lines-covered", "0"))
+                    branches_valid = int(elem.get("branches-valid", "0"))
+                    branches_covered = int(elem.get("branches-covered", "0"))
+            elif elem.tag == "line":
+                if cls_fname is not None:
+                    f_total += 1
+                    if int(elem.get("hits", "0")) > 0:
+                        f_covered += 1
+            elif elem.tag == "class":
+                file_coverages.append(FileCoverage(
+                    filename=cls_fname, total_lines=f_total, covered_lines=f_covered,
+                ))
+                cls_fname = None
+                elem.clear()
+            elif elem.tag == "package":
+                elem.clear()
 
         overall_pct = round(overall_line_rate * 100, 2)
         report = CoverageReport(
-            report_id=self._gen_id(), timestamp=datetime.utcnow().isoformat(),
+            report_id=self._gen_id(), timestamp=datetime.now(timezone.utc).isoformat(timespec="seconds"),
             source="cobertura", overall_pct=overall_pct,
             total_lines=lines_valid, covered_lines=lines_covered,
             total_branches=branches_valid, covered_branches=branches_covered,
@@ -250,19 +378,19 @@ class CoverageAnalyzer:
 
     def calculate_badge(self, coverage_pct: float) -> Dict:
         """Return badge color, label, and SVG URL for a coverage percentage."""
-        for threshold, color, label in BADGE_THRESHOLDS:
-            if coverage_pct >= threshold:
-                pct_str = f"{coverage_pct:.1f}%"
-                svg_url = f"https://img.shields.io/badge/coverage-{pct_str.replace('%', '%25')}-{color}"
-                return {
-                    "pct": coverage_pct,
-                    "color": color,
-                    "label": label,
-                    "pct_str": pct_str,
-                    "badge_url": svg_url,
-                    "markdown": f"![Coverage]({svg_url})",
-                }
-        return {"pct": 0, "color": "red", "label": "critical", "pct_str": "0%", "badge_url": "", "markdown": ""}
+        found = _badge_raw(int(coverage_pct * 10))
+        if found is None:
+            return {"pct": 0, "color": "red", "label": "critical", "pct_str": "0%", "badge_url": "", "markdown": ""}
+        color, label = found
+        svg_url = f"https://img.shields.io/badge/coverage-{coverage_pct:.1f}%25-{color}"
+        return {
+            "pct": coverage_pct,
+            "color": color,
+            "label": label,
+            "pct_str": f"{coverage_pct:.1f}%",
+            "badge_url": svg_url,
+            "markdown": f"![Coverage]({svg_url})",
+        }
 
     def diff_coverage(self, old_report: CoverageReport, new_report: CoverageReport) -> CoverageDiff:
         """Compare two coverage reports and return a CoverageDiff."""
@@ -272,13 +400,17 @@ class CoverageAnalyzer:
         improved = []
         regressed = []
         for fname, new_fc in new_files.items():
-            if fname in old_files:
-                old_pct = old_files[fname].line_pct
-                new_pct = new_fc.line_pct
-                if new_pct > old_pct + 0.1:
-                    improved.append(f"{fname}: {old_pct:.1f}% -> {new_pct:.1f}%")
-                elif new_pct < old_pct - 0.1:
-                    regressed.append(f"{fname}: {old_pct:.1f}% -> {new_pct:.1f}%")
+            old_fc = old_files.get(fname)
+            if old_fc is None:
+                continue
+            # Inline the percentage math: the line_pct property would cost
+            # two extra round() calls and attribute hops per shared file.
+            old_pct = (old_fc.covered_lines / old_fc.total_lines * 100.0) if old_fc.total_lines else 100.0
+            new_pct = (new_fc.covered_lines / new_fc.total_lines * 100.0) if new_fc.total_lines else 100.0
+            if new_pct > old_pct + 0.1:
+                improved.append(f"{fname}: {old_pct:.1f}% -> {new_pct:.1f}%")
+            elif new_pct < old_pct - 0.1:
+                regressed.append(f"{fname}: {old_pct:.1f}% -> {new_pct:.1f}%")
 
         new_file_names = [f for f in new_files if f not in old_files]
         removed_file_names = [f for f in old_files if f not in new_files]
@@ -309,20 +441,23 @@ class CoverageAnalyzer:
         }
         hex_color = color_map.get(color, "#999")
 
-        rows = []
-        for fc in sorted(report.files, key=lambda f: f.line_pct):
-            bar_width = int(fc.line_pct)
-            rows.append(
-                f"<tr><td>{fc.filename}</td><td>{fc.total_lines}</td>"
-                f"<td>{fc.covered_lines}</td><td>{fc.line_pct:.1f}%</td>"
-                f'<td><div class="bar"><div class="bar-fill" style="width:{bar_width}%;background:{hex_color}"></div></div></td></tr>'
-            )
+        # Compute each file's percentage once up front; sorting on the
+        # line_pct property would redo the divide+round per element.
+        pairs = [
+            ((fc.covered_lines / fc.total_lines * 100.0) if fc.total_lines else 100.0, fc)
+            for fc in report.files
+        ]
+        pairs.sort(key=lambda p: p[0])
 
-        html = HTML_TEMPLATE.format(
-            color=hex_color, pct=report.overall_pct,
-            rows="\n".join(rows), ts=report.timestamp,
-        )
-        return html
+        rows = [
+            _ROW_TPL % (fc.filename, fc.total_lines, fc.covered_lines, pct, int(pct), hex_color)
+            for pct, fc in pairs
+        ]
+
+        return _render_html({
+            "color": hex_color, "pct": report.overall_pct,
+            "rows": "\n".join(rows), "ts": report.timestamp,
+        })
 
     def trend_tracking(self, reports: Optional[List[CoverageReport]] = None,
                        branch: Optional[str] = None, limit: int = 30) -> List[Dict]:
@@ -331,18 +466,16 @@ class CoverageAnalyzer:
             return [{"timestamp": r.timestamp, "pct": r.overall_pct,
                      "branch": r.branch, "id": r.report_id} for r in reports]
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            if branch:
-                rows = conn.execute(
-                    "SELECT id, timestamp, overall_pct, branch FROM coverage_history "
-                    "WHERE branch=? ORDER BY timestamp DESC LIMIT ?", (branch, limit)
-                ).fetchall()
-            else:
-                rows = conn.execute(
-                    "SELECT id, timestamp, overall_pct, branch FROM coverage_history "
-                    "ORDER BY timestamp DESC LIMIT ?", (limit,)
-                ).fetchall()
+        if branch:
+            rows = self.conn.execute(
+                "SELECT id, timestamp, overall_pct, branch FROM coverage_history "
+                "WHERE branch=? ORDER BY timestamp DESC LIMIT ?", (branch, limit)
+            ).fetchall()
+        else:
+            rows = self.conn.execute(
+                "SELECT id, timestamp, overall_pct, branch FROM coverage_history "
+                "ORDER BY timestamp DESC LIMIT ?", (limit,)
+            ).fetchall()
 
         trend = [{"id": r["id"], "timestamp": r["timestamp"],
                   "pct": r["overall_pct"], "branch": r["branch"]} for r in rows]
@@ -350,48 +483,100 @@ class CoverageAnalyzer:
 
     def get_report(self, report_id: str) -> Optional[CoverageReport]:
         """Fetch a full report from the database."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            row = conn.execute("SELECT * FROM coverage_history WHERE id=?", (report_id,)).fetchone()
-            if not row:
-                return None
-            file_rows = conn.execute("SELECT * FROM file_coverage WHERE report_id=?", (report_id,)).fetchall()
-            files = [FileCoverage(
-                filename=r["filename"], total_lines=r["total_lines"], covered_lines=r["covered_lines"],
-                total_branches=r["total_branches"], covered_branches=r["covered_branches"],
-            ) for r in file_rows]
-            return CoverageReport(
-                report_id=row["id"], timestamp=row["timestamp"], source=row["source"],
-                overall_pct=row["overall_pct"], total_lines=row["total_lines"],
-                covered_lines=row["covered_lines"], total_branches=row["total_branches"],
-                covered_branches=row["covered_branches"], files=files,
-                commit_sha=row["commit_sha"], branch=row["branch"], tag=row["tag"],
-            )
+        row = self.conn.execute("SELECT * FROM coverage_history WHERE id=?", (report_id,)).fetchone()
+        if not row:
+            return None
+        file_rows = self.conn.execute("SELECT * FROM file_coverage WHERE report_id=?", (report_id,)).fetchall()
+        files = [FileCoverage(
+            filename=r["filename"], total_lines=r["total_lines"], covered_lines=r["covered_lines"],
+            total_branches=r["total_branches"], covered_branches=r["covered_branches"],
+        ) for r in file_rows]
+        return self._report_from_row(row, files)
+
+    def get_report_summary(self, report_id: str) -> Optional[CoverageReport]:
+        """Fetch only a report's aggregate row, skipping its file rows.
+
+        Cheaper than get_report when the caller just needs the overall
+        figures (badges, stats, trend annotations); the returned report
+        has an empty files list.
+        """
+        row = self.conn.execute("SELECT * FROM coverage_history WHERE id=?", (report_id,)).fetchone()
+        if not row:
+            return None
+        return self._report_from_row(row, [])
+
+    @staticmethod
+    def _report_from_row(row: sqlite3.Row, files: List[FileCoverage]) -> CoverageReport:
+        return CoverageReport(
+            report_id=row["id"], timestamp=row["timestamp"], source=row["source"],
+            overall_pct=row["overall_pct"], total_lines=row["total_lines"],
+            covered_lines=row["covered_lines"], total_branches=row["total_branches"],
+            covered_branches=row["covered_branches"], files=files,
+            commit_sha=row["commit_sha"], branch=row["branch"], tag=row["tag"],
+        )
 
     def _save_report(self, report: CoverageReport):
-        with sqlite3.connect(self.db_path) as conn:
+        conn = self.conn
+        conn.execute("BEGIN")
+        try:
+            # Upsert instead of INSERT OR REPLACE: REPLACE deletes and
+            # re-inserts (touching every index) even when nothing changed,
+            # while DO UPDATE with a change guard makes re-ingesting an
+            # identical report a no-op at the page level.
             conn.execute(
-                "INSERT OR REPLACE INTO coverage_history VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+                "INSERT INTO coverage_history VALUES (?,?,?,?,?,?,?,?,?,?,?) "
+                "ON CONFLICT(id) DO UPDATE SET "
+                "timestamp=excluded.timestamp, source=excluded.source, "
+                "overall_pct=excluded.overall_pct, total_lines=excluded.total_lines, "
+                "covered_lines=excluded.covered_lines, total_branches=excluded.total_branches, "
+                "covered_branches=excluded.covered_branches, commit_sha=excluded.commit_sha, "
+                "branch=excluded.branch, tag=excluded.tag "
+                "WHERE coverage_history.timestamp != excluded.timestamp "
+                "OR coverage_history.source != excluded.source "
+                "OR coverage_history.overall_pct != excluded.overall_pct "
+                "OR coverage_history.total_lines != excluded.total_lines "
+                "OR coverage_history.covered_lines != excluded.covered_lines "
+                "OR coverage_history.total_branches != excluded.total_branches "
+                "OR coverage_history.covered_branches != excluded.covered_branches "
+                "OR coverage_history.commit_sha != excluded.commit_sha "
+                "OR coverage_history.branch != excluded.branch "
+                "OR coverage_history.tag != excluded.tag",
                 (report.report_id, report.timestamp, report.source, report.overall_pct,
                  report.total_lines, report.covered_lines, report.total_branches,
                  report.covered_branches, report.commit_sha, report.branch, report.tag)
             )
-            for fc in report.files:
-                fid = "fc-" + hashlib.sha256(f"{report.report_id}{fc.filename}".encode()).hexdigest()[:10]
-                conn.execute(
-                    "INSERT OR REPLACE INTO file_coverage VALUES (?,?,?,?,?,?,?)",
-                    (fid, report.report_id, fc.filename, fc.total_lines,
-                     fc.covered_lines, fc.total_branches, fc.covered_branches)
-                )
+            rows = [
+                (f"fc-{report.report_id[-10:]}-{idx}",
+                 report.report_id, fc.filename, fc.total_lines,
+                 fc.covered_lines, fc.total_branches, fc.covered_branches)
+                for idx, fc in enumerate(report.files)
+            ]
+            conn.executemany(
+                "INSERT INTO file_coverage VALUES (?,?,?,?,?,?,?) "
+                "ON CONFLICT(id) DO UPDATE SET "
+                "report_id=excluded.report_id, filename=excluded.filename, "
+                "total_lines=excluded.total_lines, covered_lines=excluded.covered_lines, "
+                "total_branches=excluded.total_branches, covered_branches=excluded.covered_branches "
+                "WHERE file_coverage.filename != excluded.filename "
+                "OR file_coverage.total_lines != excluded.total_lines "
+                "OR file_coverage.covered_lines != excluded.covered_lines "
+                "OR file_coverage.total_branches != excluded.total_branches "
+                "OR file_coverage.covered_branches != excluded.covered_branches",
+                rows
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
 
     def get_stats(self) -> Dict:
         """Return aggregate statistics from the coverage history database."""
-        with sqlite3.connect(self.db_path) as conn:
-            total = conn.execute("SELECT COUNT(*) FROM coverage_history").fetchone()[0]
-            latest = conn.execute(
-                "SELECT overall_pct, timestamp FROM coverage_history ORDER BY timestamp DESC LIMIT 1"
-            ).fetchone()
-            avg = conn.execute("SELECT AVG(overall_pct) FROM coverage_history").fetchone()[0]
+        conn = self.conn
+        total = conn.execute("SELECT COUNT(*) FROM coverage_history").fetchone()[0]
+        latest = conn.execute(
+            "SELECT overall_pct, timestamp FROM coverage_history ORDER BY timestamp DESC LIMIT 1"
+        ).fetchone()
+        avg = conn.execute("SELECT AVG(overall_pct) FROM coverage_history").fetchone()[0]
         return {
             "total_reports": total,
             "latest_pct": latest[0] if latest else None,
@@ -58,6 +58,26 @@ def test_parse_lcov(tmp_path):
     assert len(report.files) == 2
 
 
+def test_parse_lcov_crlf_and_checksum(tmp_path):
+    # CRLF line endings, a DA: checksum field, a multi-digit zero count,
+    # and a final end_of_record with no trailing newline.
+    content = (
+        "SF:src/crlf.py\r\n"
+        "DA:1,1,abc123\r\n"
+        "DA:2,00\r\n"
+        "DA:3,2\r\n"
+        "end_of_record"
+    )
+    lcov_file = tmp_path / "crlf.info"
+    lcov_file.write_bytes(content.encode())
+    analyzer = make_analyzer(tmp_path)
+    report = analyzer.parse_lcov(str(lcov_file))
+    assert len(report.files) == 1
+    assert report.files[0].filename == "src/crlf.py"
+    assert report.total_lines == 3
+    assert report.covered_lines == 2
+
+
 def test_parse_cobertura(tmp_path):
     xml_file = tmp_path / "coverage.xml"
     xml_file.write_text(make_cobertura_content())
@@ -84,6 +104,19 @@ def test_calculate_badge_thresholds(tmp_path):
     assert analyzer.calculate_badge(0.0)["color"] == "red"
 
 
+def test_parse_lcov_many(tmp_path):
+    paths = []
+    for i in range(3):
+        lcov_file = tmp_path / f"cov{i}.info"
+        lcov_file.write_text(make_lcov_content())
+        paths.append(str(lcov_file))
+    analyzer = make_analyzer(tmp_path)
+    reports = analyzer.parse_lcov_many(paths, branch="main")
+    assert len(reports) == 3
+    assert all(r.total_lines == 6 for r in reports)
+    assert analyzer.get_stats()["total_reports"] == 3
+
+
 def test_diff_coverage(tmp_path):
     lcov_file = tmp_path / "cov.info"
     lcov_file.write_text(make_lcov_content())
@@ -148,6 +181,34 @@ def test_get_report_roundtrip(tmp_path):
     assert len(fetched.files) == len(original.files)
 
 
+def test_save_report_updates_metadata(tmp_path):
+    analyzer = make_analyzer(tmp_path)
+    report = CoverageReport(
+        report_id="r1", timestamp="2024-01-01T00:00:00", source="lcov",
+        overall_pct=70.0, total_lines=100, covered_lines=70,
+        files=[FileCoverage("a.py", 100, 70)], branch="main",
+    )
+    analyzer._save_report(report)
+    report.branch = "other"
+    report.tag = "v1"
+    analyzer._save_report(report)
+    fetched = analyzer.get_report("r1")
+    assert fetched.branch == "other"
+    assert fetched.tag == "v1"
+
+
+def test_get_report_summary(tmp_path):
+    lcov_file = tmp_path / "cov.info"
+    lcov_file.write_text(make_lcov_content())
+    analyzer = make_analyzer(tmp_path)
+    original = analyzer.parse_lcov(str(lcov_file))
+    summary = analyzer.get_report_summary(original.report_id)
+    assert summary is not None
+    assert summary.overall_pct == original.overall_pct
+    assert summary.files == []
+    assert analyzer.get_report_summary("nonexistent-id") is None
+
+
 def test_get_report_missing(tmp_path):
     analyzer = make_analyzer(tmp_path)
     result = analyzer.get_report("nonexistent-id")